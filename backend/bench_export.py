@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Benchmark /export memory and throughput against a throwaway SQLite database.
+
+Usage: python bench_export.py --rows 10000000 --format ndjson --gzip
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import config
+
+def seed_transactions(db_path, rows, batch_size=50000):
+    """Insert synthetic POS rows directly through sqlite3"""
+    conn = sqlite3.connect(db_path)
+    start = datetime(2024, 1, 1)
+    inserted = 0
+    while inserted < rows:
+        count = min(batch_size, rows - inserted)
+        conn.executemany(
+            "INSERT INTO \"transaction\" (product_name, amount, quantity, payment_type, timestamp, synced, local_id) "
+            "VALUES (?, ?, ?, ?, ?, 1, ?)",
+            (
+                (f"Product {i % 500}", 3.5 + (i % 20), 1 + i % 3, 'cash',
+                 (start + timedelta(seconds=i)).isoformat(sep=' '), f"local_{i}")
+                for i in range(inserted, inserted + count)
+            )
+        )
+        conn.commit()
+        inserted += count
+    conn.close()
+
+def run_benchmark(rows, export_format, compress):
+    tmp_dir = tempfile.mkdtemp()
+    db_path = os.path.join(tmp_dir, 'bench.db')
+    config.Config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+
+    from app import create_app
+    app = create_app()
+
+    print(f"Seeding {rows:,} transactions...")
+    seed_transactions(db_path, rows)
+
+    client = app.test_client()
+    query = f"/export/transactions?format={export_format}" + ("&gzip=1" if compress else "")
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.get(query, buffered=False)
+    total_bytes = 0
+    for chunk in response.response:
+        total_bytes += len(chunk)
+    response.close()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Exported {rows:,} rows as {export_format}{' (gzip)' if compress else ''}")
+    print(f"   Bytes: {total_bytes:,}")
+    print(f"   Time: {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)")
+    print(f"   Peak Python memory: {peak / 1024 / 1024:.2f} MiB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv')
+    parser.add_argument('--gzip', action='store_true')
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.format, args.gzip)
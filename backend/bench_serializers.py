@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Compare to_dict + jsonify against the precompiled encoders for a list response.
+
+Usage: python bench_serializers.py --rows 100000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask import jsonify
+
+import config
+import serializers
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def run_benchmark(rows, repeat):
+    tmp_dir = tempfile.mkdtemp()
+    config.Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+
+    from app import create_app
+    from models import db, Transaction
+    app = create_app()
+
+    with app.app_context():
+        start = datetime(2024, 1, 1)
+        db.session.bulk_insert_mappings(Transaction, [
+            {
+                'product_name': f"Product {i % 500}",
+                'amount': 3.5 + (i % 20),
+                'quantity': 1 + i % 3,
+                'payment_type': 'cash',
+                'timestamp': start + timedelta(seconds=i, microseconds=i % 1000),
+                'synced': True,
+                'local_id': f"local_{i}"
+            }
+            for i in range(rows)
+        ])
+        db.session.commit()
+
+        encoder = serializers.TRANSACTION_ENCODER
+        objects = Transaction.query.all()
+        row_tuples = encoder.select(Transaction.query).all()
+
+        with app.test_request_context():
+            def baseline():
+                return jsonify({
+                    'transactions': [t.to_dict() for t in objects],
+                    'count': len(objects)
+                }).get_data()
+
+            def encoded():
+                return serializers.json_response({
+                    'transactions': encoder.encode_rows(row_tuples),
+                    'count': len(row_tuples)
+                }).get_data()
+
+            assert json.loads(baseline()) == json.loads(encoded())
+            results = [('to_dict + jsonify', best_of(baseline, repeat))]
+
+            backend = serializers.orjson
+            if backend is not None:
+                results.append(('encoder (orjson)', best_of(encoded, repeat)))
+            serializers.orjson = None
+            results.append(('encoder (stdlib)', best_of(encoded, repeat)))
+            serializers.orjson = backend
+
+    print(f"Serializing {rows:,} transactions (best of {repeat})")
+    for name, elapsed in results:
+        print(f"   {name:<20} {elapsed * 1000:8.1f} ms  ({results[0][1] / elapsed:.1f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.repeat)
@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+
+# Rows fetched per server-side cursor batch and written per response chunk
+EXPORT_BATCH_SIZE = 1000
+
+class ExportStream:
+    @staticmethod
+    def format_value(value):
+        """Convert a column value into a JSON/CSV friendly value"""
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def csv_chunks(rows, columns, batch_size=EXPORT_BATCH_SIZE):
+        """Yield CSV text in chunks of batch_size rows, header first"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+
+        pending = 0
+        for row in rows:
+            writer.writerow([ExportStream.format_value(v) for v in row])
+            pending += 1
+            if pending >= batch_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+                pending = 0
+
+        # Always flush the remainder (or the bare header for empty exports)
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    @staticmethod
+    def ndjson_chunks(rows, columns, batch_size=EXPORT_BATCH_SIZE):
+        """Yield newline-delimited JSON in chunks of batch_size rows"""
+        lines = []
+        for row in rows:
+            record = {c: ExportStream.format_value(v) for c, v in zip(columns, row)}
+            lines.append(json.dumps(record))
+            if len(lines) >= batch_size:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def gzip_chunks(chunks):
+        """Compress a stream of text chunks into a single gzip member"""
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            data = compressor.compress(chunk.encode('utf-8'))
+            if data:
+                yield data
+        yield compressor.flush()
@@ -16,6 +16,12 @@ class Transaction(db.Model):
     local_id = db.Column(db.String(100))  # For offline sync matching
     wavepay_transaction_id = db.Column(db.String(100))  # For WavePay transactions
     
+    # Columns emitted by to_dict, in order; shared by the list encoders and /export
+    FIELDS = (
+        'id', 'product_name', 'amount', 'quantity', 'payment_type',
+        'timestamp', 'synced', 'local_id', 'wavepay_transaction_id'
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -60,6 +66,12 @@ class WavePayTransaction(db.Model):
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(20), default='pending')  # pending, completed, failed
     synced = db.Column(db.Boolean, default=False)
+    sensor_summary = db.relationship('WavePaySensorSummary', uselist=False, lazy=True)
+    
+    FIELDS = (
+        'transaction_id', 'sender_wallet_id', 'receiver_wallet_id', 'amount', 'currency',
+        'physics_signature', 'digital_signature', 'timestamp', 'status', 'synced'
+    )
     
     def to_dict(self):
         return {
@@ -73,4 +85,45 @@ class WavePayTransaction(db.Model):
             'timestamp': self.timestamp.isoformat(),
             'status': self.status,
             'synced': self.synced
-        }
\ No newline at end of file
+        }
+
+class WavePaySensorSummary(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    transaction_id = db.Column(db.String(100), db.ForeignKey('wave_pay_transaction.transaction_id'),
+                               unique=True, nullable=False)
+    device_id = db.Column(db.String(100))
+    frame_count = db.Column(db.Integer, nullable=False)
+    duration = db.Column(db.Float, nullable=False)  # Seconds between first and last frame
+    frame_signature = db.Column(db.Text, nullable=False)  # SHA-512 of the raw frames
+    features = db.Column(db.Text, nullable=False)  # JSON mean/variance/peak per channel
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @classmethod
+    def from_physics_data(cls, transaction_id, physics_data):
+        """Build a summary row for gesture-based physics data, or None if absent or malformed"""
+        if not isinstance(physics_data, dict) or physics_data.get('source') != 'sensor_frames':
+            return None
+        if not (isinstance(physics_data.get('frame_count'), int) and
+                isinstance(physics_data.get('duration'), (int, float)) and
+                isinstance(physics_data.get('frame_signature'), str) and
+                isinstance(physics_data.get('features'), dict)):
+            return None
+        return cls(
+            transaction_id=transaction_id,
+            device_id=physics_data.get('device_id'),
+            frame_count=physics_data['frame_count'],
+            duration=physics_data['duration'],
+            frame_signature=physics_data['frame_signature'],
+            features=json.dumps(physics_data['features'])
+        )
+    
+    def to_dict(self):
+        return {
+            'transaction_id': self.transaction_id,
+            'device_id': self.device_id,
+            'frame_count': self.frame_count,
+            'duration': self.duration,
+            'frame_signature': self.frame_signature,
+            'features': json.loads(self.features),
+            'created_at': self.created_at.isoformat()
+        }
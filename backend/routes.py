@@ -1,10 +1,23 @@
-from flask import request, jsonify
-from models import db, Transaction, WavePayWallet, WavePayTransaction
+from flask import request, jsonify, Response, stream_with_context
+from models import db, Transaction, WavePayWallet, WavePayTransaction, WavePaySensorSummary
 from datetime import datetime, timedelta
+from sqlalchemy import func
 import json
-from wavepay_utils import WavePayQuantum
+from wavepay_utils import (WavePayQuantum, SensorGestureRegistry, SENSOR_CHANNELS,
+                           SENSOR_FRAME_SIZE, SENSOR_MAX_FRAMES)
+from export_utils import ExportStream, EXPORT_BATCH_SIZE
+from serializers import json_response, encode_envelope, TRANSACTION_ENCODER, WAVEPAY_TRANSACTION_ENCODER
+
+# Exports always lead with id so an interrupted export can resume with after_id
+EXPORT_DATASETS = {
+    'transactions': (Transaction, list(Transaction.FIELDS)),
+    'wavepay': (WavePayTransaction, ['id'] + list(WavePayTransaction.FIELDS))
+}
 
 def init_routes(app):
+    # Gestures live in worker memory only until the transaction is created
+    sensor_gestures = SensorGestureRegistry()
+    
     @app.route('/')
     def index():
         return {'message': 'MobilePOS Lite API', 'status': 'online'}
@@ -40,10 +53,10 @@ def init_routes(app):
             
             db.session.commit()
             
-            return jsonify({
+            return json_response({
                 'message': f'Added {len(created_transactions)} transaction(s)',
-                'transactions': [t.to_dict() for t in created_transactions]
-            }), 201
+                'transactions': TRANSACTION_ENCODER.encode_objects(created_transactions)
+            }, 201)
             
         except Exception as e:
             return jsonify({'error': str(e)}), 400
@@ -66,11 +79,11 @@ def init_routes(app):
                 end = datetime.fromisoformat(end_date)
                 query = query.filter(Transaction.timestamp.between(start, end))
             
-            transactions = query.order_by(Transaction.timestamp.desc()).all()
+            rows = TRANSACTION_ENCODER.select(query.order_by(Transaction.timestamp.desc())).all()
             
-            return jsonify({
-                'transactions': [t.to_dict() for t in transactions],
-                'count': len(transactions)
+            return json_response({
+                'transactions': TRANSACTION_ENCODER.encode_rows(rows),
+                'count': len(rows)
             })
             
         except Exception as e:
@@ -122,30 +135,31 @@ def init_routes(app):
             today = datetime.utcnow().date()
             today_start = datetime.combine(today, datetime.min.time())
             
-            daily_transactions = Transaction.query.filter(
+            daily_rows = TRANSACTION_ENCODER.select(Transaction.query.filter(
                 Transaction.timestamp >= today_start
-            ).all()
+            )).all()
             
-            daily_total = sum(t.amount * t.quantity for t in daily_transactions)
-            daily_count = len(daily_transactions)
+            daily_total = sum(t.amount * t.quantity for t in daily_rows)
+            daily_count = len(daily_rows)
             
             # Weekly stats
             week_start = today - timedelta(days=today.weekday())
             week_start_dt = datetime.combine(week_start, datetime.min.time())
             
-            weekly_transactions = Transaction.query.filter(
+            weekly_count, weekly_total = db.session.query(
+                func.count(Transaction.id),
+                func.sum(Transaction.amount * Transaction.quantity)
+            ).filter(
                 Transaction.timestamp >= week_start_dt
-            ).all()
-            
-            weekly_total = sum(t.amount * t.quantity for t in weekly_transactions)
-            weekly_count = len(weekly_transactions)
+            ).one()
+            weekly_total = weekly_total or 0
             
-            return jsonify({
-                'daily': {
+            return json_response({
+                'daily': encode_envelope({
                     'total': daily_total,
                     'count': daily_count,
-                    'transactions': [t.to_dict() for t in daily_transactions]
-                },
+                    'transactions': TRANSACTION_ENCODER.encode_rows(daily_rows)
+                }),
                 'weekly': {
                     'total': weekly_total,
                     'count': weekly_count
@@ -155,6 +169,85 @@ def init_routes(app):
         except Exception as e:
             return jsonify({'error': str(e)}), 400
     
+    @app.route('/export/<dataset>', methods=['GET'])
+    def export_dataset(dataset):
+        try:
+            if dataset not in EXPORT_DATASETS:
+                return jsonify({'error': f'Unknown export dataset: {dataset}'}), 404
+            
+            model, columns = EXPORT_DATASETS[dataset]
+            
+            export_format = request.args.get('format', 'csv')
+            if export_format not in ('csv', 'ndjson'):
+                return jsonify({'error': f'Unsupported export format: {export_format}'}), 400
+            
+            days = request.args.get('days', type=int)
+            start_date = request.args.get('start_date')
+            end_date = request.args.get('end_date')
+            wallet_id = request.args.get('wallet_id')
+            after_id = request.args.get('after_id', type=int)  # Resume after last exported id
+            limit = request.args.get('limit', type=int)
+            compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+            
+            for name, value in (('days', days), ('limit', limit)):
+                if value is not None and value <= 0:
+                    return jsonify({'error': f'{name} must be a positive integer'}), 400
+            
+            # Select plain columns so rows never enter the ORM identity map
+            query = db.session.query(*[getattr(model, c) for c in columns])
+            
+            if days:
+                query = query.filter(model.timestamp >= datetime.utcnow() - timedelta(days=days))
+            else:
+                if start_date:
+                    query = query.filter(model.timestamp >= datetime.fromisoformat(start_date))
+                if end_date:
+                    query = query.filter(model.timestamp <= datetime.fromisoformat(end_date))
+            
+            if wallet_id:
+                wallet_filter = (
+                    (WavePayTransaction.sender_wallet_id == wallet_id) |
+                    (WavePayTransaction.receiver_wallet_id == wallet_id)
+                )
+                if model is WavePayTransaction:
+                    query = query.filter(wallet_filter)
+                else:
+                    # POS rows reference the ledger through wavepay_transaction_id
+                    ledger_ids = db.session.query(WavePayTransaction.transaction_id).filter(wallet_filter)
+                    query = query.filter(Transaction.wavepay_transaction_id.in_(ledger_ids))
+            
+            if after_id:
+                query = query.filter(model.id > after_id)
+            
+            # Keyset ordering on the primary key keeps resumed exports consistent
+            query = query.order_by(model.id)
+            if limit:
+                query = query.limit(limit)
+            
+            rows = query.yield_per(EXPORT_BATCH_SIZE)
+            
+            if export_format == 'csv':
+                chunks = ExportStream.csv_chunks(rows, columns)
+                mimetype = 'text/csv'
+            else:
+                chunks = ExportStream.ndjson_chunks(rows, columns)
+                mimetype = 'application/x-ndjson'
+            
+            filename = f'{dataset}_export.{export_format}'
+            if compress:
+                chunks = ExportStream.gzip_chunks(chunks)
+                mimetype = 'application/gzip'
+                filename += '.gz'
+            
+            return Response(
+                stream_with_context(chunks),
+                mimetype=mimetype,
+                headers={'Content-Disposition': f'attachment; filename={filename}'}
+            )
+            
+        except Exception as e:
+            return jsonify({'error': str(e)}), 400
+    
     # WavePay Quantum Endpoints
     @app.route('/wavepay/test', methods=['GET'])
     def test_wavepay():
@@ -163,6 +256,8 @@ def init_routes(app):
             'message': 'WavePay endpoints are working!',
             'endpoints': {
                 'create_wallet': 'POST /wavepay/create_wallet',
+                'start_gesture': 'POST /wavepay/gesture/start',
+                'gesture_frames': 'POST /wavepay/gesture/<gesture_id>/frames',
                 'create_transaction': 'POST /wavepay/create_transaction', 
                 'process_transaction': 'POST /wavepay/process_transaction'
             }
@@ -213,6 +308,49 @@ def init_routes(app):
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 400
     
+    @app.route('/wavepay/gesture/start', methods=['POST'])
+    def start_sensor_gesture():
+        try:
+            data = request.get_json(silent=True) or {}
+            gesture = sensor_gestures.start(data.get('device_id'))
+            if not gesture:
+                return jsonify({'success': False, 'error': 'Too many active gestures, retry shortly'}), 429
+            
+            return jsonify({
+                'success': True,
+                'gesture_id': gesture.gesture_id,
+                'channels': list(SENSOR_CHANNELS),
+                'frame_size': SENSOR_FRAME_SIZE
+            }), 201
+            
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+    
+    @app.route('/wavepay/gesture/<gesture_id>/frames', methods=['POST'])
+    def ingest_sensor_frames(gesture_id):
+        try:
+            gesture = sensor_gestures.get(gesture_id)
+            if not gesture:
+                return jsonify({'success': False, 'error': 'Gesture not found'}), 404
+            
+            # Refuse oversized bodies before buffering them
+            max_bytes = (SENSOR_MAX_FRAMES - gesture.frame_count) * SENSOR_FRAME_SIZE
+            if request.content_length is None:
+                return jsonify({'success': False, 'error': 'Content-Length required'}), 411
+            if request.content_length > max_bytes:
+                return jsonify({'success': False, 'error': f'Gesture exceeds {SENSOR_MAX_FRAMES} frames'}), 413
+            
+            frame_count = gesture.ingest(request.get_data(cache=False))
+            
+            return jsonify({
+                'success': True,
+                'gesture_id': gesture_id,
+                'frame_count': frame_count
+            })
+            
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+    
     @app.route('/wavepay/create_transaction', methods=['POST'])
     def create_wavepay_transaction():
         try:
@@ -224,13 +362,27 @@ def init_routes(app):
                 if field not in data:
                     return jsonify({'success': False, 'error': f'Missing field: {field}'}), 400
             
-            # Create transaction payload
-            transaction_data = WavePayQuantum.create_transaction_payload(
-                data['sender_wallet_id'],
-                data['receiver_wallet_id'],
-                float(data['amount']),
-                data.get('currency', 'CAD')
-            )
+            # Create transaction payload, from recorded sensor frames when available
+            if data.get('gesture_id'):
+                # Keep the gesture until the payload is built and signed so failures can be retried
+                gesture = sensor_gestures.get(data['gesture_id'])
+                if not gesture:
+                    return jsonify({'success': False, 'error': 'Gesture not found'}), 404
+                
+                transaction_data = WavePayQuantum.create_transaction_payload(
+                    data['sender_wallet_id'],
+                    data['receiver_wallet_id'],
+                    float(data['amount']),
+                    data.get('currency', 'CAD'),
+                    physics_data=gesture.summarize()
+                )
+            else:
+                transaction_data = WavePayQuantum.create_transaction_payload(
+                    data['sender_wallet_id'],
+                    data['receiver_wallet_id'],
+                    float(data['amount']),
+                    data.get('currency', 'CAD')
+                )
             
             # Sign the transaction
             digital_signature = WavePayQuantum.sign_transaction(
@@ -241,6 +393,9 @@ def init_routes(app):
             # Add signature to transaction data
             transaction_data['digital_signature'] = digital_signature
             
+            if data.get('gesture_id') and not sensor_gestures.pop(data['gesture_id']):
+                return jsonify({'success': False, 'error': 'Gesture already used'}), 409
+            
             return jsonify({
                 'success': True,
                 'transaction': transaction_data,
@@ -361,6 +516,11 @@ def init_routes(app):
                 synced=True
             )
             
+            wavepay_tx.sensor_summary = WavePaySensorSummary.from_physics_data(
+                transaction_data['transaction_id'],
+                transaction_data['physics_data']
+            )
+            
             # Update balances
             sender_wallet.balance -= transaction_data['amount']
             receiver_wallet.balance += transaction_data['amount']
@@ -425,6 +585,15 @@ def init_routes(app):
                         status='completed',
                         synced=True
                     )
+                    # Only keep client-supplied sensor features that match the physics signature
+                    physics_data = tx_data.get('physics_data')
+                    if physics_data and WavePayQuantum.generate_physics_signature(
+                        physics_data
+                    ) == tx_data['physics_signature']:
+                        wavepay_tx.sensor_summary = WavePaySensorSummary.from_physics_data(
+                            tx_data['transaction_id'],
+                            physics_data
+                        )
                     
                     db.session.add(wavepay_tx)
                     synced_count += 1
@@ -445,14 +614,14 @@ def init_routes(app):
     @app.route('/wavepay/transactions/<wallet_id>')
     def get_wavepay_transactions(wallet_id):
         try:
-            transactions = WavePayTransaction.query.filter(
+            rows = WAVEPAY_TRANSACTION_ENCODER.select(WavePayTransaction.query.filter(
                 (WavePayTransaction.sender_wallet_id == wallet_id) |
                 (WavePayTransaction.receiver_wallet_id == wallet_id)
-            ).order_by(WavePayTransaction.timestamp.desc()).all()
+            ).order_by(WavePayTransaction.timestamp.desc())).all()
             
-            return jsonify({
+            return json_response({
                 'success': True,
-                'transactions': [tx.to_dict() for tx in transactions]
+                'transactions': WAVEPAY_TRANSACTION_ENCODER.encode_rows(rows)
             })
             
         except Exception as e:
@@ -0,0 +1,120 @@
+import json
+import math
+from datetime import datetime
+from json.encoder import encode_basestring_ascii
+from operator import attrgetter
+
+from flask import Response
+from models import db, Transaction, WavePayTransaction
+
+try:
+    import orjson  # Optional fast JSON backend
+except ImportError:
+    orjson = None
+
+_LITERALS = {True: 'true', False: 'false', None: 'null'}
+
+def dumps(obj):
+    """Serialize obj to JSON bytes with the fastest available backend"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    try:
+        return json.dumps(obj, separators=(',', ':'), allow_nan=False).encode('utf-8')
+    except ValueError:
+        # Match orjson, which writes non-finite floats as null
+        return json.dumps(_replace_non_finite(obj), separators=(',', ':')).encode('utf-8')
+
+def _replace_non_finite(obj):
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    if isinstance(obj, dict):
+        return {key: _replace_non_finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_replace_non_finite(value) for value in obj]
+    return obj
+
+def _encode_value(value):
+    """Null-safe encoder for a single value, used when a fast column path fails"""
+    if value is None or isinstance(value, bool):
+        return _LITERALS[value]
+    if isinstance(value, datetime):
+        return '"%s"' % value.isoformat()
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+    if isinstance(value, float) and not math.isfinite(value):
+        return 'null'
+    return json.dumps(value)
+
+def _encode_floats(values):
+    # float.__repr__ writes bare inf/nan, so hand non-finite columns to the fallback
+    if not all(map(math.isfinite, values)):
+        raise ValueError("Non-finite float")
+    return list(map(float.__repr__, values))
+
+def _encode_datetimes(values):
+    return ['"%s"' % s for s in map(datetime.isoformat, values)]
+
+def _column_encoder(column_type):
+    """Pick a whole-column encoder for a SQLAlchemy column type"""
+    if isinstance(column_type, db.Boolean):
+        return lambda values: list(map(_LITERALS.__getitem__, values))
+    if isinstance(column_type, db.Integer):
+        return lambda values: list(map(int.__repr__, values))
+    if isinstance(column_type, db.Float):
+        return _encode_floats
+    if isinstance(column_type, db.DateTime):
+        return _encode_datetimes
+    return lambda values: list(map(encode_basestring_ascii, values))
+
+class ModelEncoder:
+    """Encodes row tuples of a model's columns straight to a JSON array"""
+
+    def __init__(self, model, fields):
+        self.fields = tuple(fields)
+        self.columns = [getattr(model, f) for f in fields]
+        self.getter = attrgetter(*fields)
+        # One %s slot per field, keys already escaped
+        self.template = '{' + ','.join('%s:%%s' % encode_basestring_ascii(f) for f in fields) + '}'
+        self.encoders = [_column_encoder(c.type) for c in self.columns]
+
+    def select(self, query):
+        """Restrict an ORM query to this encoder's columns so it yields row tuples"""
+        return query.with_entities(*self.columns)
+
+    def encode_rows(self, rows):
+        if orjson is not None:
+            # Still one dict per row: encoding each column with orjson and filling the
+            # template measured about 4x slower than letting orjson walk the dicts
+            fields = self.fields
+            return orjson.dumps([dict(zip(fields, row)) for row in rows])
+
+        if not rows:
+            return b'[]'
+
+        # Encode column by column so each column is formatted in one pass
+        encoded = []
+        for encoder, values in zip(self.encoders, zip(*rows)):
+            try:
+                encoded.append(encoder(values))
+            except (TypeError, KeyError, ValueError):
+                encoded.append(list(map(_encode_value, values)))
+
+        body = ','.join(map(self.template.__mod__, zip(*encoded)))
+        return ('[' + body + ']').encode('ascii')
+
+    def encode_objects(self, objects):
+        return self.encode_rows([self.getter(o) for o in objects])
+
+TRANSACTION_ENCODER = ModelEncoder(Transaction, Transaction.FIELDS)
+WAVEPAY_TRANSACTION_ENCODER = ModelEncoder(WavePayTransaction, WavePayTransaction.FIELDS)
+
+def encode_envelope(fields):
+    """Encode a dict to JSON bytes, inserting bytes values (pre-encoded lists) verbatim"""
+    parts = [
+        dumps(key) + b':' + (value if isinstance(value, bytes) else dumps(value))
+        for key, value in fields.items()
+    ]
+    return b'{' + b','.join(parts) + b'}'
+
+def json_response(fields, status=200):
+    return Response(encode_envelope(fields), status=status, mimetype='application/json')
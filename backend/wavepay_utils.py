@@ -1,13 +1,36 @@
 import hashlib
 import json
+import math
+import operator
 import random
+import secrets
+import struct
+import sys
+import threading
 import time
+from array import array
 from datetime import datetime
 import base64
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import ed25519
 from cryptography.exceptions import InvalidSignature
 
+# Packed sensor frame: offset in seconds from gesture start followed by one
+# little-endian float32 per channel, in the order below
+SENSOR_CHANNELS = (
+    'acceleration_x', 'acceleration_y', 'acceleration_z',
+    'rotation_alpha', 'rotation_beta', 'rotation_gamma',
+    'frequency', 'amplitude', 'decibels',
+    'lux', 'color_temperature', 'brightness',
+    'hpa', 'altitude'
+)
+SENSOR_FRAME_WIDTH = 1 + len(SENSOR_CHANNELS)
+SENSOR_FRAME_FORMAT = '<' + 'f' * SENSOR_FRAME_WIDTH
+SENSOR_FRAME_SIZE = struct.calcsize(SENSOR_FRAME_FORMAT)
+SENSOR_MAX_FRAMES = 6000  # 60 seconds at 100 Hz
+SENSOR_GESTURE_TTL = 120  # Seconds without frames before an unfinished gesture is discarded
+SENSOR_MAX_GESTURES = 256  # Live gestures per worker
+
 class WavePayQuantum:
     @staticmethod
     def generate_wallet_id():
@@ -107,9 +130,11 @@ class WavePayQuantum:
             return False
     
     @staticmethod
-    def create_transaction_payload(sender_wallet_id, receiver_wallet_id, amount, currency='CAD'):
-        """Create a complete WavePay transaction payload"""
-        physics_data = WavePayQuantum.simulate_physics_data()
+    def create_transaction_payload(sender_wallet_id, receiver_wallet_id, amount, currency='CAD',
+                                   physics_data=None):
+        """Create a complete WavePay transaction payload, simulating physics data if none is given"""
+        if physics_data is None:
+            physics_data = WavePayQuantum.simulate_physics_data()
         physics_signature = WavePayQuantum.generate_physics_signature(physics_data)
         
         transaction_id = f"TX{int(time.time() * 1000)}{random.randint(1000, 9999)}"
@@ -125,4 +150,115 @@ class WavePayQuantum:
             'timestamp': datetime.utcnow().isoformat()
         }
         
-        return transaction_data
\ No newline at end of file
+        return transaction_data
+
+class SensorGesture:
+    """Running frame signature and per-channel statistics for one tap-to-pay gesture"""
+    
+    def __init__(self, gesture_id, device_id=None):
+        self.gesture_id = gesture_id
+        self.device_id = device_id
+        self.last_active = time.monotonic()
+        self.frame_count = 0
+        self.frame_hash = hashlib.sha512()
+        # Fixed-width running sum, sum of squares, max and min per frame column (offset first)
+        self.stats = array('d', [0.0, 0.0, -math.inf, math.inf] * SENSOR_FRAME_WIDTH)
+        self.lock = threading.Lock()
+    
+    def ingest(self, payload):
+        """Consume packed frames, updating the frame signature and channel stats as they arrive"""
+        if len(payload) % SENSOR_FRAME_SIZE:
+            raise ValueError(f"Frame payload must be a multiple of {SENSOR_FRAME_SIZE} bytes")
+        if not payload:
+            return self.frame_count
+        
+        chunk = array('f', payload)
+        if sys.byteorder != 'little':
+            chunk.byteswap()
+        
+        # Batch stats per column, computed before any state changes so a bad batch is dropped whole
+        batch_stats = []
+        for index in range(SENSOR_FRAME_WIDTH):
+            column = chunk[index::SENSOR_FRAME_WIDTH]
+            total = sum(column)
+            squares = sum(map(operator.mul, column, column))
+            if not (math.isfinite(total) and math.isfinite(squares)):
+                raise ValueError("Sensor frames must contain only finite values")
+            batch_stats.append((total, squares, max(column), min(column)))
+        
+        with self.lock:
+            frames = len(payload) // SENSOR_FRAME_SIZE
+            if self.frame_count + frames > SENSOR_MAX_FRAMES:
+                raise ValueError(f"Gesture exceeds {SENSOR_MAX_FRAMES} frames")
+            
+            self.frame_count += frames
+            self.last_active = time.monotonic()
+            self.frame_hash.update(payload)
+            stats = self.stats
+            for base, (total, squares, peak_high, peak_low) in zip(range(0, len(stats), 4), batch_stats):
+                stats[base] += total
+                stats[base + 1] += squares
+                stats[base + 2] = max(stats[base + 2], peak_high)
+                stats[base + 3] = min(stats[base + 3], peak_low)
+            return self.frame_count
+    
+    def summarize(self):
+        """Build the physics data dict with mean/variance/peak per channel"""
+        with self.lock:
+            frame_count = self.frame_count
+            if not frame_count:
+                raise ValueError("Gesture has no sensor frames")
+            
+            stats = self.stats
+            features = {}
+            for index, channel in enumerate(SENSOR_CHANNELS, 1):
+                total, squares, peak_high, peak_low = stats[index * 4:index * 4 + 4]
+                mean = total / frame_count
+                features[channel] = {
+                    'mean': round(mean, 6),
+                    'variance': round(max(squares / frame_count - mean * mean, 0.0), 6),
+                    'peak': round(max(peak_high, -peak_low), 6)
+                }
+            
+            offset_high, offset_low = stats[2], stats[3]
+            return {
+                'source': 'sensor_frames',
+                'frame_count': frame_count,
+                'duration': round(offset_high - offset_low, 6),
+                'frame_signature': self.frame_hash.hexdigest(),
+                'features': features,
+                'timestamp': datetime.utcnow().isoformat(),
+                'device_id': self.device_id
+            }
+
+class SensorGestureRegistry:
+    """In-process table of gestures currently streaming frames"""
+    
+    def __init__(self):
+        self.gestures = {}
+        self.lock = threading.Lock()
+    
+    def start(self, device_id=None):
+        """Open a new gesture, or return None when the worker is at capacity"""
+        with self.lock:
+            self._evict_stale()
+            if len(self.gestures) >= SENSOR_MAX_GESTURES:
+                return None
+            gesture_id = f"GS{int(time.time() * 1000)}{secrets.token_hex(4)}"
+            gesture = SensorGesture(gesture_id, device_id)
+            self.gestures[gesture_id] = gesture
+            return gesture
+    
+    def get(self, gesture_id):
+        with self.lock:
+            self._evict_stale()
+            return self.gestures.get(gesture_id)
+    
+    def pop(self, gesture_id):
+        with self.lock:
+            return self.gestures.pop(gesture_id, None)
+    
+    def _evict_stale(self):
+        cutoff = time.monotonic() - SENSOR_GESTURE_TTL
+        for gesture_id in [g for g, gesture in self.gestures.items() if gesture.last_active < cutoff]:
+            del self.gestures[gesture_id]
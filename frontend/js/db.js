@@ -1,7 +1,12 @@
 // IndexedDB configuration
 const DB_NAME = 'MobilePOSDB';
-const DB_VERSION = 1;
+const DB_VERSION = 2;
 const STORE_NAME = 'transactions';
+const DAILY_TOTALS_STORE = 'daily_totals';
+
+// Booleans are not valid IndexedDB keys, so the synced index stores 0/1
+const UNSYNCED = 0;
+const SYNCED = 1;
 
 class IndexedDBManager {
     constructor() {
@@ -44,6 +49,61 @@ class IndexedDBManager {
         }
     }
 
+    // Local calendar day (YYYY-MM-DD) used as the daily totals key
+    getDayKey(timestamp) {
+        const date = new Date(timestamp);
+        const month = String(date.getMonth() + 1).padStart(2, '0');
+        const day = String(date.getDate()).padStart(2, '0');
+        return `${date.getFullYear()}-${month}-${day}`;
+    }
+
+    decryptTransaction(encrypted) {
+        return {
+            ...encrypted,
+            product_name: this.decrypt(encrypted.product_name),
+            payment_type: this.decrypt(encrypted.payment_type)
+        };
+    }
+
+    // Add (direction 1) or remove (direction -1) a transaction from its day's totals
+    adjustDailyTotal(totalsStore, transaction, direction) {
+        const day = this.getDayKey(transaction.timestamp);
+        const request = totalsStore.get(day);
+
+        request.onsuccess = () => {
+            const record = request.result || { day, total: 0, count: 0 };
+            record.total += direction * transaction.amount * transaction.quantity;
+            record.count += direction;
+            totalsStore.put(record);
+        };
+    }
+
+    // Convert legacy boolean synced flags and build daily totals from existing rows
+    migrateTransactions(store, totalsStore) {
+        const totals = {};
+        const request = store.openCursor();
+
+        request.onsuccess = () => {
+            const cursor = request.result;
+            if (cursor) {
+                const transaction = cursor.value;
+                if (typeof transaction.synced === 'boolean') {
+                    transaction.synced = transaction.synced ? SYNCED : UNSYNCED;
+                    cursor.update(transaction);
+                }
+
+                const day = this.getDayKey(transaction.timestamp);
+                totals[day] = totals[day] || { day, total: 0, count: 0 };
+                totals[day].total += transaction.amount * transaction.quantity;
+                totals[day].count++;
+
+                cursor.continue();
+            } else {
+                Object.values(totals).forEach(record => totalsStore.put(record));
+            }
+        };
+    }
+
     // Initialize database
     async init() {
         return new Promise((resolve, reject) => {
@@ -52,17 +112,40 @@ class IndexedDBManager {
             request.onerror = () => reject(request.error);
             request.onsuccess = () => {
                 this.db = request.result;
+
+                // Let other tabs upgrade the schema; the next call reopens
+                this.db.onversionchange = () => {
+                    this.db.close();
+                    this.db = null;
+                };
+
                 resolve(this.db);
             };
 
+            // Another tab still holds an older version open
+            request.onblocked = () => {
+                reject(new Error('Database upgrade blocked: close other MobilePOS tabs and reload'));
+            };
+
             request.onupgradeneeded = (event) => {
                 const db = event.target.result;
+                let store;
                 
                 // Create transactions store
                 if (!db.objectStoreNames.contains(STORE_NAME)) {
-                    const store = db.createObjectStore(STORE_NAME, { keyPath: 'local_id' });
+                    store = db.createObjectStore(STORE_NAME, { keyPath: 'local_id' });
                     store.createIndex('timestamp', 'timestamp', { unique: false });
                     store.createIndex('synced', 'synced', { unique: false });
+                } else {
+                    store = event.target.transaction.objectStore(STORE_NAME);
+                }
+
+                // Create incrementally maintained daily totals store
+                if (!db.objectStoreNames.contains(DAILY_TOTALS_STORE)) {
+                    const totalsStore = db.createObjectStore(DAILY_TOTALS_STORE, { keyPath: 'day' });
+                    if (event.oldVersion > 0) {
+                        this.migrateTransactions(store, totalsStore);
+                    }
                 }
             };
         });
@@ -73,7 +156,7 @@ class IndexedDBManager {
         if (!this.db) await this.init();
 
         return new Promise((resolve, reject) => {
-            const tx = this.db.transaction([STORE_NAME], 'readwrite');
+            const tx = this.db.transaction([STORE_NAME, DAILY_TOTALS_STORE], 'readwrite');
             const store = tx.objectStore(STORE_NAME);
             
             // Encrypt sensitive data before storing
@@ -81,37 +164,32 @@ class IndexedDBManager {
                 ...transaction,
                 product_name: this.encrypt(transaction.product_name),
                 payment_type: this.encrypt(transaction.payment_type),
-                synced: false
+                synced: UNSYNCED
             };
 
             const request = store.add(encryptedTransaction);
 
-            request.onsuccess = () => resolve(transaction.local_id);
+            request.onsuccess = () => {
+                this.adjustDailyTotal(tx.objectStore(DAILY_TOTALS_STORE), transaction, 1);
+            };
             request.onerror = () => reject(request.error);
+            tx.oncomplete = () => resolve(transaction.local_id);
+            tx.onerror = () => reject(tx.error);
         });
     }
 
-    // Get all transactions
+    // Get all transactions, newest first
     async getAllTransactions() {
         if (!this.db) await this.init();
 
         return new Promise((resolve, reject) => {
             const tx = this.db.transaction([STORE_NAME], 'readonly');
-            const store = tx.objectStore(STORE_NAME);
-            const request = store.getAll();
+            const index = tx.objectStore(STORE_NAME).index('timestamp');
+            const request = index.getAll();
 
             request.onsuccess = () => {
-                const transactions = request.result.map(encrypted => {
-                    const decrypted = {
-                        ...encrypted,
-                        product_name: this.decrypt(encrypted.product_name),
-                        payment_type: this.decrypt(encrypted.payment_type)
-                    };
-                    return decrypted;
-                });
-                
-                // Sort by timestamp descending
-                transactions.sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
+                // Index order is ascending by timestamp
+                const transactions = request.result.reverse().map(encrypted => this.decryptTransaction(encrypted));
                 resolve(transactions);
             };
 
@@ -119,77 +197,75 @@ class IndexedDBManager {
         });
     }
 
-    // Get unsynced transactions
-async getUnsyncedTransactions() {
-    if (!this.db) await this.init();
-
-    return new Promise((resolve, reject) => {
-        const tx = this.db.transaction([STORE_NAME], 'readonly');
-        const store = tx.objectStore(STORE_NAME);
-        
-        // Get all transactions and filter manually
-        const request = store.getAll();
-        
-        request.onsuccess = () => {
-            const allTransactions = request.result;
-            const unsynced = allTransactions.filter(t => !t.synced);
-            
-            const transactions = unsynced.map(encrypted => {
-                const decrypted = {
-                    ...encrypted,
-                    product_name: this.decrypt(encrypted.product_name),
-                    payment_type: this.decrypt(encrypted.payment_type)
-                };
-                return decrypted;
-            });
-            
-            resolve(transactions);
-        };
+    // Get the most recent transactions, decrypting only the rows returned
+    async getRecentTransactions(limit) {
+        if (!this.db) await this.init();
 
-        request.onerror = () => reject(request.error);
-    });
-}
-    // Mark transactions as synced
-    async markAsSynced(localIds) {
+        return new Promise((resolve, reject) => {
+            const tx = this.db.transaction([STORE_NAME], 'readonly');
+            const index = tx.objectStore(STORE_NAME).index('timestamp');
+            const request = index.openCursor(null, 'prev');
+            const transactions = [];
+
+            request.onsuccess = () => {
+                const cursor = request.result;
+                if (cursor && transactions.length < limit) {
+                    transactions.push(this.decryptTransaction(cursor.value));
+                    cursor.continue();
+                } else {
+                    resolve(transactions);
+                }
+            };
+
+            request.onerror = () => reject(request.error);
+        });
+    }
+
+    // Get unsynced transactions
+    async getUnsyncedTransactions() {
         if (!this.db) await this.init();
 
         return new Promise((resolve, reject) => {
-            const tx = this.db.transaction([STORE_NAME], 'readwrite');
-            const store = tx.objectStore(STORE_NAME);
+            const tx = this.db.transaction([STORE_NAME], 'readonly');
+            const index = tx.objectStore(STORE_NAME).index('synced');
+            const request = index.getAll(IDBKeyRange.only(UNSYNCED));
+
+            request.onsuccess = () => {
+                resolve(request.result.map(encrypted => this.decryptTransaction(encrypted)));
+            };
+
+            request.onerror = () => reject(request.error);
+        });
+    }
 
-            let completed = 0;
-            const total = localIds.length;
+    // Mark transactions as synced in a single pass over the pending rows
+    async markAsSynced(localIds) {
+        if (!this.db) await this.init();
 
-            if (total === 0) {
+        return new Promise((resolve, reject) => {
+            if (localIds.length === 0) {
                 resolve();
                 return;
             }
 
-            localIds.forEach(localId => {
-                const getRequest = store.get(localId);
-                
-                getRequest.onsuccess = () => {
-                    const transaction = getRequest.result;
-                    if (transaction) {
-                        transaction.synced = true;
-                        const updateRequest = store.put(transaction);
-                        
-                        updateRequest.onsuccess = () => {
-                            completed++;
-                            if (completed === total) {
-                                resolve();
-                            }
-                        };
-                        
-                        updateRequest.onerror = () => reject(updateRequest.error);
-                    } else {
-                        completed++;
-                        if (completed === total) resolve();
-                    }
-                };
-                
-                getRequest.onerror = () => reject(getRequest.error);
-            });
+            const pendingIds = new Set(localIds);
+            const tx = this.db.transaction([STORE_NAME], 'readwrite');
+            const index = tx.objectStore(STORE_NAME).index('synced');
+            const request = index.openCursor(IDBKeyRange.only(UNSYNCED));
+
+            request.onsuccess = () => {
+                const cursor = request.result;
+                if (!cursor) return;
+
+                if (pendingIds.has(cursor.primaryKey)) {
+                    cursor.update({ ...cursor.value, synced: SYNCED });
+                }
+                cursor.continue();
+            };
+
+            request.onerror = () => reject(request.error);
+            tx.oncomplete = () => resolve();
+            tx.onerror = () => reject(tx.error);
         });
     }
 
@@ -198,47 +274,63 @@ async getUnsyncedTransactions() {
         if (!this.db) await this.init();
 
         return new Promise((resolve, reject) => {
-            const tx = this.db.transaction([STORE_NAME], 'readwrite');
+            const tx = this.db.transaction([STORE_NAME, DAILY_TOTALS_STORE], 'readwrite');
             const store = tx.objectStore(STORE_NAME);
-            const request = store.delete(localId);
+            const getRequest = store.get(localId);
 
-            request.onsuccess = () => resolve();
-            request.onerror = () => reject(request.error);
+            getRequest.onsuccess = () => {
+                const transaction = getRequest.result;
+                if (transaction) {
+                    store.delete(localId);
+                    this.adjustDailyTotal(tx.objectStore(DAILY_TOTALS_STORE), transaction, -1);
+                }
+            };
+
+            getRequest.onerror = () => reject(getRequest.error);
+            tx.oncomplete = () => resolve();
+            tx.onerror = () => reject(tx.error);
         });
     }
 
-    // Get statistics
+    // Get statistics from daily totals and the synced index
     async getStats() {
-        const transactions = await this.getAllTransactions();
+        if (!this.db) await this.init();
+
         const now = new Date();
         const today = new Date(now.getFullYear(), now.getMonth(), now.getDate());
         const weekStart = new Date(today);
         weekStart.setDate(today.getDate() - today.getDay()); // Start of week (Sunday)
 
-        const dailyTransactions = transactions.filter(t => 
-            new Date(t.timestamp) >= today
-        );
-        
-        const weeklyTransactions = transactions.filter(t => 
-            new Date(t.timestamp) >= weekStart
-        );
+        const todayKey = this.getDayKey(today);
+        const weekStartKey = this.getDayKey(weekStart);
 
-        const dailyTotal = dailyTransactions.reduce((sum, t) => sum + (t.amount * t.quantity), 0);
-        const weeklyTotal = weeklyTransactions.reduce((sum, t) => sum + (t.amount * t.quantity), 0);
-
-        const unsynced = transactions.filter(t => !t.synced);
+        return new Promise((resolve, reject) => {
+            const tx = this.db.transaction([STORE_NAME, DAILY_TOTALS_STORE], 'readonly');
+            const totalsRequest = tx.objectStore(DAILY_TOTALS_STORE).getAll(IDBKeyRange.lowerBound(weekStartKey));
+            const pendingRequest = tx.objectStore(STORE_NAME).index('synced').count(IDBKeyRange.only(UNSYNCED));
+
+            tx.oncomplete = () => {
+                const weeklyTotals = totalsRequest.result;
+                const dailyTotals = weeklyTotals.filter(record => record.day >= todayKey);
+
+                const sumTotals = records => records.reduce((sum, record) => sum + record.total, 0);
+                const sumCounts = records => records.reduce((sum, record) => sum + record.count, 0);
+
+                resolve({
+                    daily: {
+                        total: sumTotals(dailyTotals),
+                        count: sumCounts(dailyTotals)
+                    },
+                    weekly: {
+                        total: sumTotals(weeklyTotals),
+                        count: sumCounts(weeklyTotals)
+                    },
+                    pending: pendingRequest.result
+                });
+            };
 
-        return {
-            daily: {
-                total: dailyTotal,
-                count: dailyTransactions.length
-            },
-            weekly: {
-                total: weeklyTotal,
-                count: weeklyTransactions.length
-            },
-            pending: unsynced.length
-        };
+            tx.onerror = () => reject(tx.error);
+        });
     }
 }
 
@@ -254,6 +346,10 @@ async function getAllTransactions() {
     return await dbManager.getAllTransactions();
 }
 
+async function getRecentTransactions(limit) {
+    return await dbManager.getRecentTransactions(limit);
+}
+
 async function getUnsyncedTransactions() {
     return await dbManager.getUnsyncedTransactions();
 }
@@ -62,7 +62,7 @@ async function initDashboard() {
 async function updateDashboard() {
     try {
         const stats = await getCombinedStats();
-        const transactions = await getAllTransactions();
+        const transactions = await getRecentTransactions(50);
         
         updateStatsDisplay(stats);
         updateTransactionsTable(transactions);
@@ -1,4 +1,4 @@
-const CACHE_NAME = 'mobilepos-lite-v1';
+const CACHE_NAME = 'mobilepos-lite-v2';
 const urlsToCache = [
     '/',
     '/index.html',